@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import typing
+
+if typing.TYPE_CHECKING:
+    from typing import Any
+
+
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+
+
+class MetricsCache:
+    """
+    Disk cache to store the metrics of the repositories.
+
+    Each entry is stored as a JSON file named after the hash of the
+    parameters used to calculate the metrics. Entries older than
+    the TTL are ignored.
+
+    :param path: Directory where the entries are stored.
+    :param ttl: Seconds an entry is valid.
+    """
+
+    def __init__(self, path: str, ttl: int = DEFAULT_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def key(**params: Any) -> str:
+        """Generate the key of an entry from the given parameters"""
+
+        data = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """
+        Return the entry stored with the key.
+
+        :param key: Key of the entry.
+
+        :return: The stored value or None when it doesn't exist or expired.
+        """
+        filename = self._filename(key)
+
+        try:
+            if time.time() - os.path.getmtime(filename) > self.ttl:
+                return None
+            with open(filename) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        """
+        Store the value with the key.
+
+        The entry is written to a temporary file first, so readers
+        never find an incomplete entry.
+
+        :param key: Key of the entry.
+        :param value: Value to store.
+        """
+        tmp_filename = None
+        try:
+            fd, tmp_filename = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f)
+            os.replace(tmp_filename, self._filename(key))
+        except OSError as e:
+            logging.warning(f"Unable to write cache entry: {e}")
+            if tmp_filename:
+                os.remove(tmp_filename)
+        except BaseException:
+            if tmp_filename:
+                os.remove(tmp_filename)
+            raise
+
+    def _filename(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
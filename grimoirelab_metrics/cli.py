@@ -19,6 +19,7 @@
 from __future__ import annotations
 
 import datetime
+import functools
 import json
 import logging
 import re
@@ -29,24 +30,47 @@ import typing
 import click
 import requests
 
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from importlib.metadata import version
 
 from spdx_tools.spdx.model import SpdxNone, SpdxNoAssertion
 from spdx_tools.spdx.parser.error import SPDXParsingError
 from spdx_tools.spdx.parser.parse_anything import parse_file
 
-from grimoirelab_metrics.grimoirelab_client import GrimoireLabClient
+from grimoirelab_metrics.cache import MetricsCache
+from grimoirelab_metrics.grimoirelab_client import GrimoireLabClient, DEFAULT_MAX_CONCURRENT
 from grimoirelab_metrics.metrics import get_repository_metrics, FILE_TYPE_CODE, FILE_TYPE_BINARY
 
 if typing.TYPE_CHECKING:
     from typing import Any
 
 GIT_REPO_REGEX = r"((git|http(s)?)|(git@[\w\.]+))://?([\w\.@\:/\-~]+)(\.git)(/)?"
+COMPILED_GIT_REPO_REGEX = re.compile(GIT_REPO_REGEX)
 
 DEFAULT_DEV_CATEGORIES_THRESHOLDS = (0.8, 0.95)
 DEFAULT_PONY_THRESHOLD = 0.5
 DEFAULT_ELEPHANT_THRESHOLD = 0.5
 
+MIN_POLL_DELAY = 2
+MAX_POLL_DELAY = 25
+FEW_PENDING_REPOSITORIES = 3
+FEW_PENDING_POLL_DELAY = 5
+
+TASK_STATUS_FAILED = "failed"
+
+CACHE_KEY_PARAMS = (
+    "repository",
+    "opensearch_url",
+    "opensearch_index",
+    "from_date",
+    "to_date",
+    "code_file_pattern",
+    "binary_file_pattern",
+    "pony_threshold",
+    "elephant_threshold",
+    "dev_categories_thresholds",
+)
+
 
 @click.command()
 @click.argument("filename")
@@ -101,6 +125,19 @@ DEFAULT_ELEPHANT_THRESHOLD = 0.5
     help="Developer categories thresholds",
     default=DEFAULT_DEV_CATEGORIES_THRESHOLDS,
 )
+@click.option(
+    "--max-concurrent",
+    type=click.IntRange(min=1),
+    show_default=True,
+    help="Maximum number of concurrent requests to GrimoireLab and OpenSearch",
+    default=DEFAULT_MAX_CONCURRENT,
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Directory to cache the metrics of the repositories for a day",
+    default=None,
+)
 def grimoirelab_metrics(
     filename: str,
     grimoirelab_url: str,
@@ -123,6 +160,8 @@ def grimoirelab_metrics(
     pony_threshold: float = DEFAULT_PONY_THRESHOLD,
     elephant_threshold: float = DEFAULT_ELEPHANT_THRESHOLD,
     dev_categories_thresholds: tuple[float, float] = DEFAULT_DEV_CATEGORIES_THRESHOLDS,
+    max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+    cache_dir: str | None = None,
 ) -> None:
     """Calculate metrics using GrimoireLab.
 
@@ -140,11 +179,12 @@ def grimoirelab_metrics(
 
     try:
         start_date = datetime.datetime.now(datetime.UTC)
-        grimoirelab_client = GrimoireLabClient(grimoirelab_url, grimoirelab_user, grimoirelab_password, verify_certs)
+        grimoirelab_client = GrimoireLabClient(
+            grimoirelab_url, grimoirelab_user, grimoirelab_password, verify_certs, max_concurrent=max_concurrent
+        )
         grimoirelab_client.connect()
 
-        packages = get_sbom_packages(filename)
-        git_urls = list(set(repo for repo in packages.values() if is_valid(repo)))
+        packages, git_urls = get_sbom_packages(filename)
 
         if len(git_urls) > 0:
             logging.info(f"Found {len(git_urls)} git repositories")
@@ -152,7 +192,7 @@ def grimoirelab_metrics(
             logging.info("Could not find any git repositories to analyze")
             sys.exit(0)
 
-        schedule_repositories(git_urls, grimoirelab_client)
+        scheduling_tasks = schedule_repositories(git_urls, grimoirelab_client, max_workers=max_concurrent)
 
         metrics = generate_metrics_when_ready(
             grimoirelab_client=grimoirelab_client,
@@ -172,13 +212,17 @@ def grimoirelab_metrics(
             pony_threshold=pony_threshold,
             elephant_threshold=elephant_threshold,
             dev_categories_thresholds=dev_categories_thresholds,
+            scheduling_tasks=scheduling_tasks,
+            cache=MetricsCache(cache_dir) if cache_dir else None,
+            max_workers=max_concurrent,
         )
 
         package_metrics = {"packages": {}}
         for package, repo in packages.items():
             if repo and repo in metrics["repositories"]:
-                package_metrics["packages"][package] = metrics["repositories"][repo]
-                package_metrics["packages"][package]["repository"] = repo
+                entry = dict(metrics["repositories"][repo])
+                entry["repository"] = repo
+                package_metrics["packages"][package] = entry
             else:
                 package_metrics["packages"][package] = {"metrics": None}
 
@@ -197,7 +241,7 @@ def grimoirelab_metrics(
             "dev_categories_thresholds": dev_categories_thresholds,
         }
 
-        output.write(json.dumps(package_metrics, indent=4))
+        json.dump(package_metrics, output, indent=4)
     except SPDXParsingError as e:
         logging.error(e.messages[0])
         sys.exit(1)
@@ -207,50 +251,84 @@ def grimoirelab_metrics(
 
 
 def get_repository(download_location: str) -> str | None:
-    if is_valid(download_location):
-        git_regex = re.search(GIT_REPO_REGEX, download_location)
-        if git_regex:
-            uri = f"https://{git_regex.group(5)}"
-            return uri
+    if is_valid(download_location) and ".git" in download_location:
+        return _parse_git_repository(download_location)
     return None
 
 
-def get_sbom_packages(file: str) -> dict[str, str]:
+@functools.lru_cache(maxsize=None)
+def _parse_git_repository(download_location: str) -> str | None:
+    """Extract the git repository from a download location.
+
+    Results are cached, so the regex runs once per different
+    location even when many packages share it.
+    """
+    git_regex = COMPILED_GIT_REPO_REGEX.search(download_location)
+    if git_regex:
+        uri = f"https://{git_regex.group(5)}"
+        return uri
+    return None
+
+
+def get_sbom_packages(file: str) -> tuple[dict[str, str | None], list[str]]:
     """Extract packages and git repositories from SPDX SBoM file.
 
+    Repositories are deduplicated while the packages are read,
+    keeping the order in which they appear in the file.
+
     :param file: SPDX SBoM file.
 
-    :return: Dict with package and repositories.
+    :return: Dict with package and repositories, and list of unique repositories.
     """
     logging.info(f"Parsing file {file}")
 
     packages = {}
+    repositories = {}
     document = parse_file(file)
     for package in document.packages:
         repository = get_repository(package.download_location)
+        packages[package.spdx_id] = repository
         if repository:
-            packages[package.spdx_id] = repository
+            repositories[repository] = None
         else:
-            packages[package.spdx_id] = None
             logging.warning(f"Could not find a git repository for {package.spdx_id} ({package.name})")
 
-    return packages
+    return packages, list(repositories)
 
 
-def schedule_repositories(repositories: list[str], grimoirelab_client: GrimoireLabClient) -> None:
+def schedule_repositories(
+    repositories: list[str],
+    grimoirelab_client: GrimoireLabClient,
+    max_workers: int = DEFAULT_MAX_CONCURRENT,
+) -> dict[str, Future]:
     """Schedule tasks to collect data from a list of repositories.
 
+    Tasks are scheduled concurrently in the background. The function
+    returns as soon as all of them are submitted, so repositories can be
+    checked while the rest are still being scheduled.
+
     :param repositories: List of git repositories.
     :param grimoirelab_client: GrimoireLab API client.
+    :param max_workers: Maximum number of tasks scheduled at the same time.
+
+    :return: Dict with repositories and the futures of their scheduling.
     """
     logging.info("Scheduling tasks")
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    scheduling_tasks = {}
     for package_url in repositories:
         logging.debug(f"Scheduling task to fetch commits from {package_url}")
-        try:
-            schedule_repository(grimoirelab_client=grimoirelab_client, uri=package_url, datasource="git", category="commit")
-        except (requests.HTTPError, requests.ConnectionError) as e:
-            logging.error(f"Error scheduling task: {e}")
-            raise e
+        scheduling_tasks[package_url] = executor.submit(
+            schedule_repository,
+            grimoirelab_client=grimoirelab_client,
+            uri=package_url,
+            datasource="git",
+            category="commit",
+        )
+    executor.shutdown(wait=False)
+
+    return scheduling_tasks
 
 
 def generate_metrics_when_ready(
@@ -271,9 +349,18 @@ def generate_metrics_when_ready(
     pony_threshold: float = 0.5,
     elephant_threshold: float = 0.5,
     dev_categories_thresholds: tuple[float, float] = (0.8, 0.95),
+    scheduling_tasks: dict[str, Future] | None = None,
+    cache: MetricsCache | None = None,
+    max_workers: int = DEFAULT_MAX_CONCURRENT,
 ) -> dict[str:Any]:
     """Generate metrics once the repositories have finished the collection.
 
+    Repositories with a task still being scheduled are not checked
+    until the task is scheduled. Then, they are checked once right
+    away and later together with the rest of pending repositories.
+    If any of these tasks fails, the pending ones are cancelled and
+    the error is raised.
+
     :param grimoirelab_client: GrimoireLab API client.
     :param repositories: List of repositories.
     :param opensearch_url: OpenSearch URL.
@@ -291,6 +378,9 @@ def generate_metrics_when_ready(
     :param pony_threshold: Pony Factor threshold.
     :param elephant_threshold: Elephant Factor threshold.
     :param dev_categories_thresholds: Developer Categories thresholds.
+    :param scheduling_tasks: Dict with repositories and the futures of their scheduling.
+    :param cache: Cache to reuse the metrics calculated in previous runs.
+    :param max_workers: Maximum number of status checks and metrics calculated at the same time.
     """
     logging.info("Generating metrics")
 
@@ -298,13 +388,31 @@ def generate_metrics_when_ready(
 
     after_date = datetime.datetime.now(datetime.UTC) - datetime.timedelta(days=7)
     pending_repositories = set(repositories)
+    scheduling_tasks = dict(scheduling_tasks or {})
     metrics = {"repositories": {}}
-
-    while pending_repositories:
-        processed = set()
-        for repository in pending_repositories:
-            if repository_ready(grimoirelab_client, repository, after_date):
-                metrics["repositories"][repository] = get_repository_metrics(
+    delay = MIN_POLL_DELAY
+    next_poll = time.time()
+
+    with (
+        ThreadPoolExecutor(max_workers=max_workers) as poll_executor,
+        ThreadPoolExecutor(max_workers=max_workers) as metrics_executor,
+    ):
+        futures = {}
+        while pending_repositories:
+            scheduled = _check_scheduling_tasks(scheduling_tasks)
+            full_poll = time.time() >= min(next_poll, limit_time)
+            if full_poll:
+                checked = [repository for repository in pending_repositories if repository not in scheduling_tasks]
+            else:
+                # Woken up by newly scheduled repositories; the rest wait for the next poll
+                checked = [repository for repository in scheduled if repository in pending_repositories]
+            processed = repositories_ready(grimoirelab_client, checked, after_date, poll_executor)
+
+            for repository, status in processed.items():
+                # Metrics of failed tasks might be incomplete; don't keep them
+                futures[repository] = metrics_executor.submit(
+                    _get_repository_metrics,
+                    cache=cache if status != TASK_STATUS_FAILED else None,
                     repository=repository,
                     opensearch_url=opensearch_url,
                     opensearch_index=opensearch_index,
@@ -320,17 +428,28 @@ def generate_metrics_when_ready(
                     pony_threshold=pony_threshold,
                     elephant_threshold=elephant_threshold,
                     dev_categories_thresholds=dev_categories_thresholds,
+                    max_concurrent=max_workers,
                 )
-                processed.add(repository)
 
-        pending_repositories -= processed
+            pending_repositories.difference_update(processed)
 
-        if pending_repositories and time.time() < limit_time:
-            logging.info(f"Waiting for {len(pending_repositories)} repositories to be ready")
-            logging.debug(f"Repositories not ready: {pending_repositories}")
-            time.sleep(25)
-        else:
-            break
+            if not pending_repositories or time.time() >= limit_time:
+                break
+
+            if full_poll:
+                logging.info(f"Waiting for {len(pending_repositories)} repositories to be ready")
+                logging.debug(f"Repositories not ready: {pending_repositories}")
+                next_poll = time.time() + delay
+                delay = _next_poll_delay(delay, progress=bool(processed), pending=len(pending_repositories))
+
+            wait_time = max(0, min(next_poll, limit_time) - time.time())
+            if scheduling_tasks:
+                wait(scheduling_tasks.values(), timeout=wait_time, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(wait_time)
+
+        for repository, future in futures.items():
+            metrics["repositories"][repository] = future.result()
 
     for repository in pending_repositories:
         logging.warning(f"Timeout waiting for repository {repository} to be ready")
@@ -338,31 +457,129 @@ def generate_metrics_when_ready(
     return metrics
 
 
-def repository_ready(grimoirelab_client: GrimoireLabClient, repository: str, after_date: datetime.datetime) -> bool:
+def _get_repository_metrics(cache: MetricsCache | None, **kwargs) -> dict[str, Any]:
+    """Get the metrics of a repository, reusing the cached ones when available.
+
+    The parameters that don't change the result, like the credentials
+    or the timeout, are not part of the cache key.
+
+    :param cache: Cache of metrics; when None, metrics are always calculated.
+    :param kwargs: Parameters for `get_repository_metrics`.
+    """
+    if not cache:
+        return get_repository_metrics(**kwargs)
+
+    key = cache.key(**{param: value for param, value in kwargs.items() if param in CACHE_KEY_PARAMS})
+    metrics = cache.get(key)
+    if metrics is None:
+        metrics = get_repository_metrics(**kwargs)
+        cache.set(key, metrics)
+    else:
+        logging.debug(f"Using cached metrics for {kwargs['repository']}")
+
+    return metrics
+
+
+def _check_scheduling_tasks(scheduling_tasks: dict[str, Future]) -> list[str]:
+    """Remove the tasks that were scheduled from the dict.
+
+    :param scheduling_tasks: Dict with repositories and the futures of their scheduling.
+
+    :return: List of repositories scheduled since the last check.
+
+    :raises HTTPError, ConnectionError: when a task couldn't be scheduled.
+    """
+    scheduled = []
+    for repository, future in list(scheduling_tasks.items()):
+        if not future.done():
+            continue
+        try:
+            future.result()
+        except (requests.HTTPError, requests.ConnectionError) as e:
+            logging.error(f"Error scheduling task: {e}")
+            for pending in scheduling_tasks.values():
+                pending.cancel()
+            raise e
+        del scheduling_tasks[repository]
+        scheduled.append(repository)
+
+    return scheduled
+
+
+def _next_poll_delay(delay: float, progress: bool, pending: int) -> float:
+    """Calculate the seconds to wait before checking the repositories again.
+
+    The delay is halved when some repositories were ready in the last
+    check and doubled otherwise, always within the polling limits.
+    When only a few repositories are pending, they are checked more often.
+
+    :param delay: Current delay in seconds.
+    :param progress: Whether any repository was ready in the last check.
+    :param pending: Number of repositories not ready yet.
+    """
+    if progress:
+        delay = max(MIN_POLL_DELAY, delay // 2)
+    else:
+        delay = min(MAX_POLL_DELAY, delay * 2)
+
+    if pending <= FEW_PENDING_REPOSITORIES:
+        delay = min(delay, FEW_PENDING_POLL_DELAY)
+
+    return delay
+
+
+def repositories_ready(
+    grimoirelab_client: GrimoireLabClient,
+    repositories: list[str],
+    after_date: datetime.datetime,
+    executor: ThreadPoolExecutor,
+) -> dict[str, str]:
+    """
+    Check which of the repositories have finished their tasks.
+
+    The status of each repository is requested concurrently
+    using the given executor.
+
+    :param grimoirelab_client: GrimoireLab API client.
+    :param repositories: List of repository URIs
+    :param after_date: Date to check if the tasks have finished
+    :param executor: Executor to check the repositories
+
+    :return: Dict with the repositories that are ready and the status of their tasks.
+    """
+    statuses = executor.map(lambda repository: repository_ready(grimoirelab_client, repository, after_date), repositories)
+
+    return {repository: status for repository, status in zip(repositories, statuses) if status}
+
+
+def repository_ready(grimoirelab_client: GrimoireLabClient, repository: str, after_date: datetime.datetime) -> str | None:
     """
     Check if the task related to the repository has finished.
 
     :param grimoirelab_client: GrimoireLab API client.
     :param repository: Repository URI
     :param after_date: Date to check if the task has finished
+
+    :return: Status of the task when it has finished, None otherwise.
     """
     try:
         r = grimoirelab_client.get("/datasources/repositories/", params={"uri": repository})
     except requests.HTTPError as e:
         logging.warning(f"Error checking repository status: {e}")
-        return False
+        return None
 
     repo_data = r.json()
 
     task = repo_data["results"][0]["task"]
-    if task["status"] == "failed":
+    if task["status"] == TASK_STATUS_FAILED:
         logging.warning(f"Metrics for '{repository}' might be incomplete")
-        return True
+        return task["status"]
     elif task["last_run"]:
         last_run_dt = datetime.datetime.fromisoformat(task["last_run"])
-        return last_run_dt > after_date
+        if last_run_dt > after_date:
+            return task["status"]
 
-    return False
+    return None
 
 
 def is_valid(repository: str) -> bool:
@@ -17,12 +17,17 @@
 #
 
 import logging
+import os
+import threading
 import time
 
 import requests
 
+from requests.adapters import HTTPAdapter
+
 
 MAX_RETRIES = 5
+DEFAULT_MAX_CONCURRENT = min(32, (os.cpu_count() or 4) * 2)
 
 
 class GrimoireLabClient:
@@ -33,9 +38,18 @@ class GrimoireLabClient:
     :param user: Username to use when authentication is required.
     :param password: Password to use when authentication is required.
     :param verify_certs: Verify the server's SSL certificate.
+    :param max_concurrent: Maximum number of concurrent requests; the pool keeps
+        alive one connection for each of them.
     """
 
-    def __init__(self, url: str, user: str = None, password: str = None, verify_certs: bool = True):
+    def __init__(
+        self,
+        url: str,
+        user: str = None,
+        password: str = None,
+        verify_certs: bool = True,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+    ):
         self.url = url
         self.user = user
         self.password = password
@@ -43,11 +57,13 @@ class GrimoireLabClient:
         self._token = None
         self._refresh_token = None
         self._verify_certs = verify_certs
+        self._max_concurrent = max_concurrent
+        self._lock = threading.Lock()
 
     def connect(self):
         """Establish a connection to the server, and create a token"""
 
-        self.session = requests.Session()
+        self.session = self._create_session()
         if not (self.user and self.password):
             return
 
@@ -61,14 +77,34 @@ class GrimoireLabClient:
 
         self.session.headers.update({"Authorization": f"Bearer {self._token}"})
 
-    def _reconnect(self):
-        """Reconnect to the server using a new Session and the current token"""
+    def _reconnect(self, session: requests.Session):
+        """Reconnect to the server using a new Session and the current token
 
-        logging.debug("Server closed the connection. Reconnecting to the server.")
+        The client is shared by several threads, so the session is only
+        replaced when it is still the one that failed; otherwise, another
+        thread already reconnected.
 
-        self.session = requests.Session()
-        if self._token:
-            self.session.headers.update({"Authorization": f"Bearer {self._token}"})
+        :param session: Session used in the failed request.
+        """
+        with self._lock:
+            if self.session is not session:
+                return
+
+            logging.debug("Server closed the connection. Reconnecting to the server.")
+
+            self.session = self._create_session()
+            if self._token:
+                self.session.headers.update({"Authorization": f"Bearer {self._token}"})
+
+    def _create_session(self) -> requests.Session:
+        """Create a session able to keep alive concurrent connections"""
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self._max_concurrent, pool_maxsize=self._max_concurrent)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        return session
 
     def get(self, uri: str, *args, **kwargs) -> requests.Response:
         """
@@ -103,20 +139,22 @@ class GrimoireLabClient:
         last_exception = None
 
         for attempt in range(MAX_RETRIES):
+            session = self.session
+            token = self._token
             try:
-                response = self.session.request(method, url, *args, verify=self._verify_certs, **kwargs)
+                response = session.request(method, url, *args, verify=self._verify_certs, **kwargs)
                 response.raise_for_status()
                 return response
             except requests.HTTPError as e:
-                if e.response.status_code == 403 and self._refresh_token:
-                    self._refresh_auth_token()
+                if e.response.status_code in (401, 403) and self._refresh_token:
+                    self._refresh_auth_token(token)
                 elif e.response.status_code == 405:
                     # This case is when the repository already exists
                     return e.response
                 else:
                     last_exception = e
             except (requests.ConnectionError, requests.Timeout) as e:
-                self._reconnect()
+                self._reconnect(session)
                 last_exception = e
 
             delay = 2**attempt
@@ -126,16 +164,25 @@ class GrimoireLabClient:
         if last_exception:
             raise last_exception
 
-    def _refresh_auth_token(self):
-        """Refresh the access token using the refresh token"""
+    def _refresh_auth_token(self, token: str):
+        """Refresh the access token using the refresh token
 
-        logging.debug("Refreshing token...")
+        The token is only refreshed when it is still the one rejected
+        by the server; otherwise, another thread already refreshed it.
 
-        credentials = {"refresh": self._refresh_token}
-        response = self.post("token/refresh/", json=credentials)
-        response.raise_for_status()
-        data = response.json()
+        :param token: Access token used in the rejected request.
+        """
+        with self._lock:
+            if self._token != token:
+                return
 
-        self._token = data.get("access")
+            logging.debug("Refreshing token...")
 
-        self.session.headers.update({"Authorization": f"Bearer {self._token}"})
+            credentials = {"refresh": self._refresh_token}
+            response = self.session.post(f"{self.url}/token/refresh/", json=credentials, verify=self._verify_certs)
+            response.raise_for_status()
+            data = response.json()
+
+            self._token = data.get("access")
+
+            self.session.headers.update({"Authorization": f"Bearer {self._token}"})
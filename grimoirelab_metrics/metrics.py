@@ -18,9 +18,15 @@
 
 from __future__ import annotations
 
+import array
+import bisect
 import datetime
+import functools
+import itertools
 import logging
+import operator
 import re
+import statistics
 import typing
 
 from collections import Counter
@@ -52,10 +58,22 @@ GIT_EVENT_FILE_ACTIONS = [
     GIT_EVENT_ACTION_REPLACED,
     GIT_EVENT_ACTION_COPIED,
 ]
+GIT_COMMIT_EVENT_FIELDS = [
+    "type",
+    "data.commit",
+    "data.Author",
+    "data.CommitDate",
+    "data.message",
+    "data.refs",
+    "data.files.file",
+    "data.files.added",
+    "data.files.removed",
+]
+GIT_FILE_EVENT_FIELDS = ["type", "data.filename", "data.new_filename"]
 
 AUTHOR_FIELD = "Author"
 FILE_TYPE_CODE = (
-    r"\.bazel$|\.bazelrc$|\.bzl$|\.c$|\.cc$|\.cp$|\.cpp$|\.cs$\|\.cxx$|\.c\+\+$|"
+    r"\.bazel$|\.bazelrc$|\.bzl$|\.c$|\.cc$|\.cp$|\.cpp$|\.cs$|\.cxx$|\.c\+\+$|"
     r"\.go$|\.h$|\.hpp$|\.js$|\.mjs$|\.java$|\.pl$|\.py$|\.rs$|\.sh$|\.tf$|\.ts$"
 )
 FILE_TYPE_BINARY = (
@@ -63,13 +81,61 @@ FILE_TYPE_BINARY = (
     r"\.dll$|\.dmg$|\.exe$|\.gz$|\.ipa$|\.iso$|\.jar$|\.lib$|\.msi$|\.o$|\.obj$|\.rar$|"
     r"\.rpm$|\.so$|\.tar$|\.xar$|\.xz$|\.zip$|\.zst$|\.Z$"
 )
+CODE_FILE_EXTENSIONS = frozenset(
+    extension.removeprefix(r"\.").removesuffix("$").replace("\\", "") for extension in FILE_TYPE_CODE.split("|")
+)
+BINARY_FILE_EXTENSIONS = frozenset(
+    extension.removeprefix(r"\.").removesuffix("$").replace("\\", "") for extension in FILE_TYPE_BINARY.split("|")
+)
 LICENSE_FILE_REGEX = r"LICENSE|LICENSE\.md|LICENSE\.txt|COPYING"
 ADOPTERS_FILE_REGEX = r"ADOPTERS|ADOPTERS\.md|ADOPTERS\.txt"
-COMPILED_LICENSE_FILE_REGEX = re.compile(LICENSE_FILE_REGEX)
-COMPILED_ADOPTERS_FILE_REGEX = re.compile(ADOPTERS_FILE_REGEX)
+LICENSE_FILE_NAMES = frozenset(name.replace("\\", "") for name in LICENSE_FILE_REGEX.split("|"))
+ADOPTERS_FILE_NAMES = frozenset(name.replace("\\", "") for name in ADOPTERS_FILE_REGEX.split("|"))
+
+# Filename fields of each file action and how they change the number of files
+GIT_EVENT_FILE_ACTION_CHANGES = {
+    GIT_EVENT_ACTION_ADDED: (("filename", 1),),
+    GIT_EVENT_ACTION_DELETED: (("filename", -1),),
+    GIT_EVENT_ACTION_REPLACED: (("filename", -1), ("new_filename", 1)),
+    GIT_EVENT_ACTION_COPIED: (("new_filename", 1),),
+}
 
 
 class GitEventsAnalyzer:
+    # Attributes are read for every event; slots make their access cheaper
+    __slots__ = (
+        "from_date",
+        "to_date",
+        "total_commits",
+        "recent_commits",
+        "_author_ids",
+        "_organization_ids",
+        "contributors",
+        "_sorted_contributions",
+        "contributors_growth",
+        "returning_contributors",
+        "organizations",
+        "recent_organizations",
+        "recent_contributors",
+        "file_types",
+        "added_lines",
+        "removed_lines",
+        "messages_sizes",
+        "re_code_pattern",
+        "re_binary_pattern",
+        "pony_threshold",
+        "elephant_threshold",
+        "dev_categories_thresholds",
+        "first_commit",
+        "last_commit",
+        "first_commit_date",
+        "last_commit_date",
+        "active_branches",
+        "_half_period",
+        "_recent_period",
+        "files_found",
+    )
+
     def __init__(
         self,
         from_date: datetime.datetime | None = None,
@@ -92,7 +158,11 @@ class GitEventsAnalyzer:
 
         self.total_commits: int = 0
         self.recent_commits: int = 0
+        # Contributors and organizations are stored by numeric id
+        self._author_ids: dict[str, int] = {}
+        self._organization_ids: dict[str, int] = {}
         self.contributors: Counter = Counter()
+        self._sorted_contributions: tuple[list[int], list[int]] | None = None
         self.contributors_growth: dict[str, set] = {"first_half": set(), "second_half": set()}
         self.returning_contributors: dict[str, set] = {"first_period": set(), "second_period": set()}
         self.organizations: Counter = Counter()
@@ -101,9 +171,16 @@ class GitEventsAnalyzer:
         self.file_types: dict = {"code": 0, "binary": 0, "other": 0}
         self.added_lines: int = 0
         self.removed_lines: int = 0
-        self.messages_sizes: list = []
-        self.re_code_pattern = re.compile(code_file_pattern or FILE_TYPE_CODE)
-        self.re_binary_pattern = re.compile(binary_file_pattern or FILE_TYPE_BINARY)
+        self.messages_sizes: array.array = array.array("L")
+        code_file_pattern = code_file_pattern or FILE_TYPE_CODE
+        binary_file_pattern = binary_file_pattern or FILE_TYPE_BINARY
+        if code_file_pattern == FILE_TYPE_CODE and binary_file_pattern == FILE_TYPE_BINARY:
+            # Default patterns only check extensions; use a lookup instead
+            self.re_code_pattern = None
+            self.re_binary_pattern = None
+        else:
+            self.re_code_pattern = _compile_file_type_regex(code_file_pattern)
+            self.re_binary_pattern = _compile_file_type_regex(binary_file_pattern)
         self.pony_threshold = pony_threshold
         self.elephant_threshold = elephant_threshold
         self.dev_categories_thresholds = dev_categories_thresholds
@@ -113,22 +190,48 @@ class GitEventsAnalyzer:
         self.last_commit_date: datetime.datetime | None = None
         self.active_branches: set = set()
         self._half_period = self.from_date + (self.to_date - self.from_date) / 2
+        # Commits are recent when they are less than 91 days older than 'to_date'
+        self._recent_period = self.to_date - datetime.timedelta(days=91)
         self.files_found: dict[str, int] = {"license": 0, "adopters": 0}
 
     def process_events(self, events: iter(dict[str, Any])):
+        # Bind the attributes used on each event to local names; this
+        # avoids looking them up again on every iteration.
+        recent_period = self._recent_period
+        update_commit_count = self._update_commit_count
+        update_branches = self._update_branches
+        update_contributors = self._update_contributors
+        update_organizations = self._update_organizations
+        update_file_metrics = self._update_file_metrics
+        update_message_size_metrics = self._update_message_size_metrics
+        update_first_and_last_commit = self._update_first_and_last_commit
+        check_files_found = self._check_files_found
+
+        # Contributions will change; sort them again when needed
+        self._sorted_contributions = None
+
         for event in events:
-            if event["type"] == GIT_EVENT_COMMIT:
-                event_data = event.get("data")
-
-                self._update_commit_count(event_data)
-                self._update_branches(event_data)
-                self._update_contributors(event_data)
-                self._update_organizations(event_data)
-                self._update_file_metrics(event_data)
-                self._update_message_size_metrics(event_data)
-                self._update_first_and_last_commit(event_data)
-            elif event["type"] in GIT_EVENT_FILE_ACTIONS:
-                self._check_files_found(event)
+            event_type = event["type"]
+            if event_type == GIT_EVENT_COMMIT:
+                event_data = event["data"]
+
+                # Parse the commit date once for all the metrics
+                try:
+                    commit_date = _parse_commit_date(event_data.get("CommitDate"))
+                    recent = commit_date > recent_period
+                except (ValueError, TypeError, InvalidDateError):
+                    commit_date = None
+                    recent = False
+
+                update_commit_count(recent)
+                update_branches(event_data)
+                update_contributors(event_data, commit_date, recent)
+                update_organizations(event_data, recent)
+                update_file_metrics(event_data)
+                update_message_size_metrics(event_data)
+                update_first_and_last_commit(event_data, commit_date)
+            elif event_type in GIT_EVENT_FILE_ACTIONS:
+                check_files_found(event)
 
     def get_commit_count(self):
         return self.total_commits
@@ -139,39 +242,36 @@ class GitEventsAnalyzer:
     def get_organization_count(self):
         return len(self.organizations)
 
-    def get_pony_factor(self):
-        """Number of individuals producing up to 50% of the total number of code contributions"""
+    def get_pony_factor(self, threshold: float | None = None):
+        """
+        Number of individuals producing up to 50% of the total number of code contributions
 
-        partial_contributions = 0
-        pony_factor = 0
+        :param threshold: Rate of the total commits to reach; by default, the analyzer's one
+        """
+        if threshold is None:
+            threshold = self.pony_threshold
 
-        if len(self.contributors) == 0:
+        contributions, acc_commits = self._get_sorted_contributions()
+        if not contributions:
             return 0
 
-        for _, contributions in self.contributors.most_common():
-            partial_contributions += contributions
-            pony_factor += 1
-            if partial_contributions / self.total_commits > self.pony_threshold:
-                break
-
-        return pony_factor
+        # The factor is the first position where the accumulated
+        # commits exceed the threshold of the total commits
+        total_commits = self.total_commits
+        position = bisect.bisect_right(acc_commits, threshold, key=lambda commits: commits / total_commits)
 
-    def get_elephant_factor(self):
-        """Number of organizations producing up to 50% of the total number of code contributions"""
+        return min(position + 1, len(contributions))
 
-        partial_contributions = 0
-        elephant_factor = 0
-
-        if len(self.organizations) == 0:
-            return 0
+    def get_elephant_factor(self, threshold: float | None = None):
+        """
+        Number of organizations producing up to 50% of the total number of code contributions
 
-        for _, contributions in self.organizations.most_common():
-            partial_contributions += contributions
-            elephant_factor += 1
-            if partial_contributions / self.total_commits > self.elephant_threshold:
-                break
+        :param threshold: Rate of the total commits to reach; by default, the analyzer's one
+        """
+        if threshold is None:
+            threshold = self.elephant_threshold
 
-        return elephant_factor
+        return self._get_factor(self.organizations, threshold)
 
     def get_file_type_metrics(self):
         """Get the file type metrics"""
@@ -196,7 +296,7 @@ class GitEventsAnalyzer:
         median = 0
         if number > 0:
             mean = total / number
-            median = sorted(self.messages_sizes)[number // 2]
+            median = statistics.median_high(self.messages_sizes)
 
         metrics = {
             "total": total,
@@ -215,42 +315,51 @@ class GitEventsAnalyzer:
         metrics = {"week": None, "month": None, "year": None}
 
         if days_interval >= 7:
-            metrics["week"] = self.total_commits / (days_interval / 7)
+            metrics["week"] = self.total_commits * 7 / days_interval
 
         if days_interval >= 30:
-            metrics["month"] = self.total_commits / (days_interval / 30)
+            metrics["month"] = self.total_commits * 30 / days_interval
 
         if days_interval >= 365:
-            metrics["year"] = self.total_commits / (days_interval / 365)
+            metrics["year"] = self.total_commits * 365 / days_interval
 
         return metrics
 
-    def get_developer_categories(self):
-        """Return the number of core, regular and casual developers"""
-
-        core = 0
-        regular = 0
-        casual = 0
-        regular_threshold = int(self.dev_categories_thresholds[0] * self.total_commits)
-        casual_threshold = int(self.dev_categories_thresholds[1] * self.total_commits)
-        acc_commits = 0
-        last_core_contribution = 0
-
-        for _, contributions in self.contributors.most_common():
-            acc_commits += contributions
-
-            if acc_commits <= regular_threshold or contributions > last_core_contribution:
-                last_core_contribution = contributions
-                core += 1
-            elif acc_commits <= casual_threshold or contributions == last_core_contribution:
-                regular += 1
-            else:
-                casual += 1
+    def get_developer_categories(self, thresholds: tuple[float, float] | None = None):
+        """
+        Return the number of core, regular and casual developers
+
+        Thresholds only apply to the processed commits, so the categories
+        can be calculated with different ones without processing the
+        events again.
+
+        :param thresholds: Rates of the total commits of core and regular
+            developers; by default, the analyzer's ones
+        """
+        if thresholds is None:
+            thresholds = self.dev_categories_thresholds
+
+        regular_threshold = thresholds[0] * self.total_commits
+        casual_threshold = thresholds[1] * self.total_commits
+
+        contributions, acc_commits = self._get_sorted_contributions()
+        if not contributions:
+            return {"core": 0, "regular": 0, "casual": 0}
+
+        # Categories are consecutive ranges of the sorted contributions,
+        # so their limits are found with binary searches on the accumulated
+        # commits. Core developers include at least the top contributor,
+        # and regular ones include those with as many commits as the last
+        # core developer.
+        core = max(1, bisect.bisect_right(acc_commits, regular_threshold))
+        last_core_contribution = contributions[core - 1]
+        same_as_last_core = bisect.bisect_right(contributions, -last_core_contribution, key=operator.neg)
+        regular_end = max(core, bisect.bisect_right(acc_commits, casual_threshold), same_as_last_core)
 
         return {
             "core": core,
-            "regular": regular,
-            "casual": casual,
+            "regular": regular_end - core,
+            "casual": len(contributions) - regular_end,
         }
 
     def get_recent_organizations(self):
@@ -355,41 +464,72 @@ class GitEventsAnalyzer:
     def get_returning_contributors(self):
         """Return the number of returning contributors by period."""
 
-        returning_contributors = 0
-        for author in self.returning_contributors["first_period"]:
-            if author in self.returning_contributors["second_period"]:
-                returning_contributors += 1
+        first_period = self.returning_contributors["first_period"]
+        second_period = self.returning_contributors["second_period"]
+
+        return len(first_period & second_period)
+
+    def _get_factor(self, contributions: Counter, threshold: float) -> int:
+        """
+        Number of top contributors producing more than the threshold of the total commits.
+
+        Only the top contributors that can reach the threshold are sorted.
+        All of them are sorted when those are not enough.
+
+        :param contributions: Counter with the commits of each contributor
+        :param threshold: Rate of the total commits to reach
+        """
+        partial_contributions = 0
+        factor = 0
+
+        if len(contributions) == 0:
+            return 0
+
+        top = max(64, int(len(contributions) * threshold) + 32)
+        if top < len(contributions):
+            top_contributions = contributions.most_common(top)
+            if sum(commits for _, commits in top_contributions) / self.total_commits <= threshold:
+                top_contributions = contributions.most_common()
+        else:
+            top_contributions = contributions.most_common()
+
+        for _, commits in top_contributions:
+            partial_contributions += commits
+            factor += 1
+            if partial_contributions / self.total_commits > threshold:
+                break
+
+        return factor
+
+    def _get_sorted_contributions(self) -> tuple[list[int], list[int]]:
+        """
+        Return the commits of each contributor sorted in descending order
+        and their accumulated sum.
 
-        return returning_contributors
+        The lists are calculated once and reused until new events are processed.
+        """
+        if self._sorted_contributions is None:
+            contributions = sorted(self.contributors.values(), reverse=True)
+            self._sorted_contributions = (contributions, list(itertools.accumulate(contributions)))
+
+        return self._sorted_contributions
 
-    def _update_commit_count(self, event_data):
+    def _update_commit_count(self, recent):
         """Update the commit count and commits by period."""
 
         # Update total commits
         self.total_commits += 1
 
         # Update commits by period
-        try:
-            commit_date = str_to_datetime(event_data.get("CommitDate"))
-            days_interval = (self.to_date - commit_date).days
-        except (ValueError, TypeError, InvalidDateError):
-            return
-
-        if days_interval <= 90:
+        if recent:
             self.recent_commits += 1
 
-    def _update_contributors(self, event_data):
-        author = event_data[AUTHOR_FIELD]
+    def _update_contributors(self, event_data, commit_date, recent):
+        author = self._author_ids.setdefault(event_data[AUTHOR_FIELD], len(self._author_ids))
 
         self.contributors[author] += 1
 
         # Update contributor growth
-        try:
-            commit_date = event_data.get("CommitDate")
-            commit_date = str_to_datetime(commit_date)
-        except (ValueError, TypeError, InvalidDateError):
-            commit_date = None
-
         if commit_date and self._half_period:
             if commit_date < self._half_period:
                 self.contributors_growth["first_half"].add(author)
@@ -398,122 +538,112 @@ class GitEventsAnalyzer:
 
         # Update contributors by period
         if commit_date:
-            days_interval = (self.to_date - commit_date).days
-            if days_interval <= 90:
+            if recent:
                 self.recent_contributors.add(author)
                 self.returning_contributors["second_period"].add(author)
             else:
                 self.returning_contributors["first_period"].add(author)
 
-    def _update_organizations(self, event_data):
-        try:
-            author = event_data[AUTHOR_FIELD]
-            organization = author.split("@")[1][:-1]
-        except (IndexError, KeyError):
+    def _update_organizations(self, event_data, recent):
+        # Authors have the format 'Name <user@domain>'
+        author = event_data.get(AUTHOR_FIELD, "")
+        start = author.rfind("@") + 1
+        end = author.rfind(">")
+        if not start or end < start:
             return
+        domain = author[start:end]
+        organization = self._organization_ids.setdefault(domain, len(self._organization_ids))
 
         self.organizations[organization] += 1
 
         # Update organizations by period
-        try:
-            commit_date = str_to_datetime(event_data.get("CommitDate"))
-            days_interval = (self.to_date - commit_date).days
-        except (ValueError, TypeError, InvalidDateError):
-            pass
-        else:
-            if days_interval <= 90:
-                self.recent_organizations.add(organization)
+        if recent:
+            self.recent_organizations.add(organization)
 
     def _update_file_metrics(self, event):
         if "files" not in event:
             return
 
+        # Accumulate the metrics of the commit and update them once
+        file_types = {"code": 0, "binary": 0, "other": 0}
+        added_lines = 0
+        removed_lines = 0
+        re_code_search = self.re_code_pattern.search if self.re_code_pattern else None
+        re_binary_search = self.re_binary_pattern.search if self.re_binary_pattern else None
+
         for file in event["files"]:
-            if not file["file"]:
+            filename = file["file"]
+            if not filename:
                 continue
 
-            # File type metrics
-            if self.re_code_pattern.search(file["file"]):
-                self.file_types["code"] += 1
-            elif self.re_binary_pattern.search(file["file"]):
-                self.file_types["binary"] += 1
+            # File type metrics; code patterns take precedence over binary ones
+            if not re_code_search:
+                file_type = _get_file_type_by_extension(filename)
+            elif re_code_search(filename):
+                file_type = "code"
+            elif re_binary_search(filename):
+                file_type = "binary"
             else:
-                self.file_types["other"] += 1
-
-            # Line added/removed metrics
-            if "added" in file:
-                try:
-                    self.added_lines += int(file["added"])
-                except ValueError:
-                    pass
-            if "removed" in file:
-                try:
-                    self.removed_lines += int(file["removed"])
-                except ValueError:
-                    pass
+                file_type = "other"
+            file_types[file_type] += 1
+
+            # Line added/removed metrics; binary files have '-' instead of a number
+            added = file.get("added")
+            if isinstance(added, int):
+                added_lines += added
+            elif isinstance(added, str) and added.isdecimal():
+                added_lines += int(added)
+            removed = file.get("removed")
+            if isinstance(removed, int):
+                removed_lines += removed
+            elif isinstance(removed, str) and removed.isdecimal():
+                removed_lines += int(removed)
+
+        for file_type, count in file_types.items():
+            self.file_types[file_type] += count
+        self.added_lines += added_lines
+        self.removed_lines += removed_lines
 
     def _check_files_found(self, event):
         """
         Check if the file exists in the event data and update metrics accordingly.
 
         To identify if a file exists, it checks the filename against
-        the regular expressions for license and adopters files.
+        the names of license and adopters files.
         When the filename matches, added and copied actions increase the count,
         deleted and replaced actions decrease the count if it is the filename,
         and increase if it is the new filename.
         If the file count is greater than zero, it indicates that at least one
         of the files exists in the repository.
         """
-        event_type = event["type"]
         data = event["data"]
 
-        if event_type == GIT_EVENT_ACTION_ADDED:
-            if COMPILED_LICENSE_FILE_REGEX.fullmatch(data["filename"]):
-                self.files_found["license"] += 1
-            elif COMPILED_ADOPTERS_FILE_REGEX.fullmatch(data["filename"]):
-                self.files_found["adopters"] += 1
-
-        elif event_type == GIT_EVENT_ACTION_DELETED:
-            if COMPILED_LICENSE_FILE_REGEX.fullmatch(data["filename"]):
-                self.files_found["license"] -= 1
-            elif COMPILED_ADOPTERS_FILE_REGEX.fullmatch(data["filename"]):
-                self.files_found["adopters"] -= 1
-
-        elif event_type == GIT_EVENT_ACTION_REPLACED:
-            if COMPILED_LICENSE_FILE_REGEX.fullmatch(data["filename"]):
-                self.files_found["license"] -= 1
-            elif COMPILED_ADOPTERS_FILE_REGEX.fullmatch(data["filename"]):
-                self.files_found["adopters"] -= 1
-            if COMPILED_LICENSE_FILE_REGEX.fullmatch(data["new_filename"]):
-                self.files_found["license"] += 1
-            elif COMPILED_ADOPTERS_FILE_REGEX.fullmatch(data["new_filename"]):
-                self.files_found["adopters"] += 1
-
-        elif event_type == GIT_EVENT_ACTION_COPIED:
-            if COMPILED_LICENSE_FILE_REGEX.fullmatch(data["new_filename"]):
-                self.files_found["license"] += 1
-            elif COMPILED_ADOPTERS_FILE_REGEX.fullmatch(data["new_filename"]):
-                self.files_found["adopters"] += 1
+        for field, delta in GIT_EVENT_FILE_ACTION_CHANGES[event["type"]]:
+            filename = data[field]
+            if filename in LICENSE_FILE_NAMES:
+                self.files_found["license"] += delta
+            elif filename in ADOPTERS_FILE_NAMES:
+                self.files_found["adopters"] += delta
 
     def _update_message_size_metrics(self, event):
         message = event.get("message", "")
         self.messages_sizes.append(len(message))
 
-    def _update_first_and_last_commit(self, event):
+    def _update_first_and_last_commit(self, event, commit_date):
         """Update last commit and first commit metadata."""
 
         commit = event.get("commit")
-        commit_date = event.get("CommitDate")
         if not commit_date or not commit:
             return
 
-        commit_date = str_to_datetime(commit_date)
-
-        if not self.first_commit or self.first_commit_date > commit_date:
+        if not self.first_commit:
+            self.first_commit = self.last_commit = commit
+            self.first_commit_date = self.last_commit_date = commit_date
+        elif commit_date < self.first_commit_date:
             self.first_commit = commit
             self.first_commit_date = commit_date
-
-        if not self.last_commit or self.last_commit_date < commit_date:
+        elif commit_date > self.last_commit_date:
+            # A commit older than the first one can't be newer than the last one
             self.last_commit = commit
             self.last_commit_date = commit_date
 
@@ -524,11 +654,10 @@ class GitEventsAnalyzer:
             return
 
         for ref in event_data["refs"]:
-            if "refs/heads/" not in ref:
-                continue
-
-            branch_name = ref.split("refs/heads/")[1]
-            self.active_branches.add(branch_name)
+            # Refs can be decorated, like 'HEAD -> refs/heads/main'
+            _, heads, branch_name = ref.partition("refs/heads/")
+            if heads:
+                self.active_branches.add(branch_name)
 
 
 def get_repository_metrics(
@@ -547,6 +676,7 @@ def get_repository_metrics(
     pony_threshold: float | None = None,
     elephant_threshold: float | None = None,
     dev_categories_thresholds: tuple[float, float] = (0.8, 0.95),
+    max_concurrent: int | None = None,
 ):
     """
     Get the metrics from a repository.
@@ -566,6 +696,8 @@ def get_repository_metrics(
     :param pony_threshold: Threshold for the pony factor
     :param elephant_threshold: Threshold for the elephant factor
     :param dev_categories_thresholds: Threshold for the developer categories
+    :param max_concurrent: Maximum number of concurrent requests to OpenSearch,
+        by default the one defined by the OpenSearch client
     """
     os_conn = connect_to_opensearch(
         url=opensearch_url,
@@ -574,6 +706,7 @@ def get_repository_metrics(
         ca_certs_path=opensearch_ca_certs,
         verify_certs=verify_certs,
         timeout=opensearch_timeout,
+        pool_maxsize=max_concurrent,
     )
 
     analyzer = GitEventsAnalyzer(
@@ -586,33 +719,38 @@ def get_repository_metrics(
         dev_categories_thresholds=dev_categories_thresholds,
     )
 
-    # Process commit events for the repository within the specified date range
-    events = get_repository_events(
-        connection=os_conn,
-        index_name=opensearch_index,
-        repository=repository,
-        event_type=[GIT_EVENT_COMMIT],
-        from_date=from_date,
-        to_date=to_date,
-    )
-    analyzer.process_events(events)
+    # Commit events within the specified date range and events of license
+    # and adopters files until the end date are fetched with a single query
+    commit_filters = [Q("terms", type=[GIT_EVENT_COMMIT])]
+    commit_date_range = _format_date(from_date, to_date)
+    if commit_date_range:
+        commit_filters.append(Q("range", time=commit_date_range))
 
-    # Process file events for the repository, only for license and adopters files
     file_regex = ADOPTERS_FILE_REGEX + r"|" + LICENSE_FILE_REGEX
-    file_filter = Q(
+    file_filters = [
+        Q("terms", type=GIT_EVENT_FILE_ACTIONS),
+        Q(
+            "bool",
+            should=[Q("regexp", data__filename=file_regex), Q("regexp", data__new_filename=file_regex)],
+            minimum_should_match=1,
+        ),
+    ]
+    file_date_range = _format_date(None, to_date)
+    if file_date_range:
+        file_filters.append(Q("range", time=file_date_range))
+
+    events_filter = Q(
         "bool",
-        should=[Q("regexp", data__filename=file_regex), Q("regexp", data__new_filename=file_regex)],
+        should=[Q("bool", filter=commit_filters), Q("bool", filter=file_filters)],
         minimum_should_match=1,
     )
     events = get_repository_events(
         connection=os_conn,
         index_name=opensearch_index,
         repository=repository,
-        event_type=GIT_EVENT_FILE_ACTIONS,
-        to_date=to_date,
-        additional_filter=file_filter,
+        additional_filter=events_filter,
+        fields=GIT_COMMIT_EVENT_FIELDS + GIT_FILE_EVENT_FIELDS,
     )
-
     analyzer.process_events(events)
 
     metrics = {"metrics": {}}
@@ -664,6 +802,7 @@ def get_repository_events(
     from_date: datetime.datetime | None = None,
     to_date: datetime.datetime | None = None,
     additional_filter: Any | None = None,
+    fields: list[str] | None = None,
 ) -> iter(dict[str, Any]):
     """
     Returns the events for a repository within a specified date range and event type.
@@ -675,6 +814,7 @@ def get_repository_events(
     :param from_date: Start date, by default None
     :param to_date: End date, by default None
     :param additional_filter: Additional filter to apply to the search query, by default None
+    :param fields: List of fields to return from each event, by default all of them
     """
     s = Search(using=connection, index=index_name).filter("match", source=repository)
 
@@ -688,9 +828,13 @@ def get_repository_events(
     if additional_filter:
         s = s.filter(additional_filter)
 
+    if fields:
+        s = s.source(includes=fields)
+
     return s.scan()
 
 
+@functools.lru_cache(maxsize=4)
 def connect_to_opensearch(
     url: str,
     username: str | None = None,
@@ -699,10 +843,16 @@ def connect_to_opensearch(
     verify_certs: bool = True,
     max_retries: int = 3,
     timeout: int = 30,
+    pool_maxsize: int | None = None,
 ) -> OpenSearch:
     """
     Connect to an OpenSearch instance using the given parameters.
 
+    Connections are shared by the calls that use the same parameters,
+    including the size of the pool, so the pool of HTTP connections
+    is reused between repositories. Only the last few connections
+    are kept.
+
     :param url: URL of the OpenSearch instance
     :param username: Username to connect to OpenSearch
     :param password: Password to connect to OpenSearch
@@ -710,6 +860,8 @@ def connect_to_opensearch(
     :param verify_certs: Boolean, verify SSL/TLS certificates
     :param max_retries: Maximum number of retries in case of timeout
     :param timeout: Timeout for each request in seconds
+    :param pool_maxsize: Maximum number of connections kept alive in the pool,
+        by default the one defined by the OpenSearch client
 
     :return: OpenSearch connection
     """
@@ -728,11 +880,66 @@ def connect_to_opensearch(
         max_retries=max_retries,
         retry_on_timeout=True,
         timeout=timeout,
+        pool_maxsize=pool_maxsize,
     )
 
     return os_conn
 
 
+@functools.lru_cache(maxsize=16384)
+def _parse_commit_date(commit_date: str) -> datetime.datetime:
+    """
+    Convert the date of a commit to a datetime object.
+
+    Commits created by the same batch or rebase share their date,
+    so parsed dates are cached. ISO 8601 dates are parsed with
+    datetime.fromisoformat, which is much faster than the generic
+    parser used for the rest of formats.
+
+    :param commit_date: Date of the commit
+    """
+    if isinstance(commit_date, str) and commit_date[:1].isdigit():
+        try:
+            date = datetime.datetime.fromisoformat(commit_date)
+        except ValueError:
+            pass
+        else:
+            if not date.tzinfo:
+                date = date.replace(tzinfo=datetime.timezone.utc)
+            return date
+
+    return str_to_datetime(commit_date)
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_file_type_regex(file_pattern: str) -> re.Pattern:
+    """
+    Compile the regex that matches a file type.
+
+    Compiled regexes are shared by the analyzers that use the same patterns.
+
+    :param file_pattern: Regular expression to match the file type
+    """
+    return re.compile(file_pattern)
+
+
+def _get_file_type_by_extension(filename: str) -> str:
+    """
+    Return the type of file using the default extensions.
+
+    :param filename: Path of the file
+    """
+    _, dot, extension = filename.rpartition(".")
+    if not dot:
+        return "other"
+    elif extension in CODE_FILE_EXTENSIONS:
+        return "code"
+    elif extension in BINARY_FILE_EXTENSIONS:
+        return "binary"
+    else:
+        return "other"
+
+
 def _format_date(from_date: datetime.datetime | None, to_date: datetime.datetime | None) -> dict:
     """
     Format the date range for the OpenSearch query.
@@ -35,6 +35,10 @@ from grimoirelab_metrics.cli import grimoirelab_metrics
 
 GRIMOIRELAB_URL = "http://localhost:8000"
 
+# Keep the output of the runs in memory when tmpfs is available,
+# unless a temporary directory is set in the environment
+TEMP_DIR = os.environ.get("TMPDIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
+
 
 class EndToEndTestCase(unittest.TestCase):
     """Base class to build end to end tests.
@@ -48,7 +52,7 @@ class EndToEndTestCase(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         logging.getLogger().handlers = []
-        cls.temp_file = tempfile.NamedTemporaryFile(delete=False)
+        cls.temp_file = tempfile.NamedTemporaryFile(dir=TEMP_DIR, suffix=".json", delete=False)
         cls.runner = CliRunner()
         cls._start_redis_container(cls)
         cls._start_database_container(cls)
@@ -65,6 +69,8 @@ class EndToEndTestCase(unittest.TestCase):
         cls.mysql_container.stop()
         cls.opensearch_container.stop()
         cls.redis_container.stop()
+        cls.temp_file.close()
+        os.unlink(cls.temp_file.name)
 
     def _start_database_container(self):
         self.mysql_container = MySqlContainer(image="mariadb:latest", root_password="root").with_exposed_ports(3306)
@@ -117,22 +123,33 @@ class EndToEndTestCase(unittest.TestCase):
 
     def _preload_repositories(self):
         self.runner.invoke(
-            grimoirelab_metrics,
-            [
-                "./data/archived_repos.spdx.xml",
-                "--grimoirelab-url",
-                GRIMOIRELAB_URL,
-                "--grimoirelab-user",
-                "admin",
-                "--grimoirelab-password",
-                "admin",
-                "--opensearch-url",
-                self.opensearch_url,
-                "--opensearch-index",
-                "events",
-                "--output",
-                self.temp_file.name,
-                "--from-date=2000-01-01",
-            ],
+            grimoirelab_metrics, list(self.metrics_argv("./data/archived_repos.spdx.xml", "--from-date=2000-01-01"))
         )
         time.sleep(20)
+
+    @classmethod
+    def metrics_argv(cls, spdx_file, *options):
+        """Return the arguments to run the metrics CLI on a SPDX file.
+
+        The arguments connect to the servers of the test case and
+        write the metrics to its temporary file.
+
+        :param spdx_file: path to the SPDX file
+        :param options: extra options for the CLI
+        """
+        return (
+            spdx_file,
+            "--grimoirelab-url",
+            GRIMOIRELAB_URL,
+            "--grimoirelab-user",
+            "admin",
+            "--grimoirelab-password",
+            "admin",
+            "--opensearch-url",
+            cls.opensearch_url,
+            "--opensearch-index",
+            "events",
+            "--output",
+            cls.temp_file.name,
+            *options,
+        )
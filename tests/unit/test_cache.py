@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import datetime
+import os
+import tempfile
+import unittest
+
+from grimoirelab_metrics.cache import MetricsCache
+
+
+class TestMetricsCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = MetricsCache(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key(self):
+        """Check if keys only depend on the value of the parameters"""
+
+        from_date = datetime.datetime(2024, 1, 1)
+        key = MetricsCache.key(repository="https://example.com/repo", from_date=from_date, thresholds=(0.8, 0.95))
+        same_key = MetricsCache.key(thresholds=(0.8, 0.95), from_date=from_date, repository="https://example.com/repo")
+        other_key = MetricsCache.key(repository="https://example.com/repo", from_date=from_date, thresholds=(0.5, 0.95))
+
+        self.assertEqual(key, same_key)
+        self.assertNotEqual(key, other_key)
+
+    def test_get_set(self):
+        """Check if stored entries are returned"""
+
+        self.assertIsNone(self.cache.get("key"))
+
+        self.cache.set("key", {"metrics": {"total_commits": 10}})
+        self.assertDictEqual(self.cache.get("key"), {"metrics": {"total_commits": 10}})
+
+        self.cache.set("key", {"metrics": {"total_commits": 20}})
+        self.assertDictEqual(self.cache.get("key"), {"metrics": {"total_commits": 20}})
+        self.assertListEqual(os.listdir(self.temp_dir.name), ["key.json"])
+
+    def test_set_invalid_value(self):
+        """Check if no temporary files are left when a value can't be stored"""
+
+        with self.assertRaises(TypeError):
+            self.cache.set("key", {"metrics": {"dates": {datetime.datetime(2024, 1, 1)}}})
+
+        self.assertIsNone(self.cache.get("key"))
+        self.assertListEqual(os.listdir(self.temp_dir.name), [])
+
+    @unittest.skipIf(os.geteuid() == 0, "root can write on read-only directories")
+    def test_set_read_only_dir(self):
+        """Check if entries that can't be written are ignored"""
+
+        os.chmod(self.temp_dir.name, 0o555)
+        try:
+            with self.assertLogs(level="WARNING") as logs:
+                self.cache.set("key", {"metrics": {"total_commits": 10}})
+        finally:
+            os.chmod(self.temp_dir.name, 0o755)
+
+        self.assertIn("Unable to write cache entry", logs.output[0])
+        self.assertIsNone(self.cache.get("key"))
+        self.assertListEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_set_missing_dir(self):
+        """Check if entries are ignored when the directory can't be written"""
+
+        self.temp_dir.cleanup()
+
+        with self.assertLogs(level="WARNING") as logs:
+            self.cache.set("key", {"metrics": {"total_commits": 10}})
+
+        self.assertIn("Unable to write cache entry", logs.output[0])
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_expired_entry(self):
+        """Check if entries older than the TTL are ignored"""
+
+        cache = MetricsCache(self.temp_dir.name, ttl=60)
+        cache.set("key", {"metrics": {"total_commits": 10}})
+
+        two_minutes_ago = datetime.datetime.now().timestamp() - 120
+        os.utime(os.path.join(self.temp_dir.name, "key.json"), (two_minutes_ago, two_minutes_ago))
+
+        self.assertIsNone(cache.get("key"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -21,15 +21,26 @@ import json
 import logging
 import os
 import tempfile
+import time
 import unittest
 
 import httpretty
 import requests
 
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 from click.testing import CliRunner
-from grimoirelab_metrics.cli import grimoirelab_metrics, get_repository
+from spdx_tools.spdx.model import SpdxNone, SpdxNoAssertion
+from grimoirelab_metrics.cli import (
+    grimoirelab_metrics,
+    get_repository,
+    generate_metrics_when_ready,
+    repositories_ready,
+    _next_poll_delay,
+)
+from grimoirelab_metrics.grimoirelab_client import GrimoireLabClient
 
 
 GRIMOIRELAB_URL = "http://localhost:8000"
@@ -75,18 +86,33 @@ def setup_get_repositories_mock_server():
     http_requests = []
 
     def request_callback(request, uri, headers):
-        last_request = httpretty.last_request()
-        http_requests.append(last_request)
-        data = {
-            "results": [
-                {
-                    "task": {
-                        "last_run": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
-                        "status": "completed",
-                    }
-                }
-            ]
+        http_requests.append(request)
+        task = {
+            "last_run": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+            "status": "completed",
+        }
+        data = {"results": [{"task": task}]}
+        body = json.dumps(data)
+
+        return 200, headers, body
+
+    httpretty.register_uri(httpretty.GET, REPOSITORIES_URL, responses=[httpretty.Response(body=request_callback)])
+
+    return http_requests
+
+
+def setup_get_failed_repositories_mock_server():
+    """Setup a mock HTTP server for repository API calls with failed tasks"""
+
+    http_requests = []
+
+    def request_callback(request, uri, headers):
+        http_requests.append(request)
+        task = {
+            "last_run": None,
+            "status": "failed",
         }
+        data = {"results": [{"task": task}]}
         body = json.dumps(data)
 
         return 200, headers, body
@@ -102,19 +128,13 @@ def setup_get_never_ending_repositories_mock_server():
     http_requests = []
 
     def request_callback(request, uri, headers):
-        last_request = httpretty.last_request()
-        http_requests.append(last_request)
+        http_requests.append(request)
         last_run = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(days=365)
-        data = {
-            "results": [
-                {
-                    "task": {
-                        "last_run": last_run.isoformat(),
-                        "status": "running",
-                    }
-                }
-            ]
+        task = {
+            "last_run": last_run.isoformat(),
+            "status": "running",
         }
+        data = {"results": [{"task": task}]}
         body = json.dumps(data)
 
         return 200, headers, body
@@ -367,6 +387,8 @@ class TestCli(unittest.TestCase):
                 OPENSEARCH_URL,
                 "--opensearch-index",
                 OPENSEARCH_INDEX,
+                "--max-concurrent",
+                "5",
                 "--output",
                 self.temp_file.name,
             ],
@@ -374,7 +396,80 @@ class TestCli(unittest.TestCase):
 
         self.assertEqual(result.exit_code, 1)
         self.assertIn("Error scheduling task", result.output)
-        self.assertEqual(len(http_requests), 5)
+        # Repositories are scheduled concurrently and each one is retried 5 times
+        self.assertEqual(len(http_requests), 25)
+
+    @httpretty.activate
+    @patch("grimoirelab_metrics.cli.get_repository_metrics")
+    def test_cache_dir(self, mock_get_repository_metrics):
+        """Check if metrics are reused from the cache in later runs"""
+
+        setup_add_repository_mock_server()
+        setup_get_repositories_mock_server()
+        mock_get_repository_metrics.return_value = {"metrics": {"num_commits": 10}}
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            runner = CliRunner()
+            args = [
+                "./data/valid.spdx.xml",
+                "--grimoirelab-url",
+                GRIMOIRELAB_URL,
+                "--opensearch-url",
+                OPENSEARCH_URL,
+                "--opensearch-index",
+                OPENSEARCH_INDEX,
+                "--output",
+                self.temp_file.name,
+                "--cache-dir",
+                cache_dir,
+            ]
+            result = runner.invoke(grimoirelab_metrics, args)
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(mock_get_repository_metrics.call_count, 5)
+
+            result = runner.invoke(grimoirelab_metrics, args)
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(mock_get_repository_metrics.call_count, 5)
+
+            with open(self.temp_file.name) as f:
+                metrics = json.load(f)
+                self.assertEqual(len(metrics["packages"]), 5)
+                for data in metrics["packages"].values():
+                    self.assertEqual(data["metrics"]["num_commits"], 10)
+
+    @httpretty.activate
+    @patch("grimoirelab_metrics.cli.get_repository_metrics")
+    def test_cache_dir_failed_tasks(self, mock_get_repository_metrics):
+        """Check if metrics of repositories with failed tasks are not cached"""
+
+        setup_add_repository_mock_server()
+        setup_get_failed_repositories_mock_server()
+        mock_get_repository_metrics.return_value = {"metrics": {"num_commits": 10}}
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            runner = CliRunner()
+            args = [
+                "./data/valid.spdx.xml",
+                "--grimoirelab-url",
+                GRIMOIRELAB_URL,
+                "--opensearch-url",
+                OPENSEARCH_URL,
+                "--opensearch-index",
+                OPENSEARCH_INDEX,
+                "--output",
+                self.temp_file.name,
+                "--cache-dir",
+                cache_dir,
+            ]
+            result = runner.invoke(grimoirelab_metrics, args)
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn("might be incomplete", result.output)
+            self.assertEqual(mock_get_repository_metrics.call_count, 5)
+            self.assertListEqual(os.listdir(cache_dir), [])
+
+            result = runner.invoke(grimoirelab_metrics, args)
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(mock_get_repository_metrics.call_count, 10)
 
     @httpretty.activate
     @patch("grimoirelab_metrics.cli.get_repository_metrics")
@@ -410,7 +505,11 @@ class TestCli(unittest.TestCase):
             result.output,
         )
         self.assertEqual(len(http_requests), 5)
-        self.assertEqual(len(http_requests_repos), 10)
+        # Repositories are checked again and again until the timeout expires
+        checks = Counter(request.querystring["uri"][0] for request in http_requests_repos)
+        self.assertEqual(len(checks), 5)
+        for uri, count in checks.items():
+            self.assertGreater(count, 2, uri)
 
 
 class TestGetRepository(unittest.TestCase):
@@ -437,6 +536,8 @@ class TestGetRepository(unittest.TestCase):
             "git+https://git.myproject.org/MyProject",
             "svn+svn://svn.myproject.org/svn/MyProject",
             "https://git.myproject.org/MyProject/file.py",
+            "https://pypi.org/project/requests/2.32.3",
+            "https://registry.npmjs.org/left-pad/-/left-pad-1.3.0.tgz",
         ]
 
         for uri in invalid_git_uris:
@@ -444,6 +545,85 @@ class TestGetRepository(unittest.TestCase):
                 result = get_repository(uri)
                 self.assertEqual(result, None)
 
+    def test_unset_download_location(self):
+        """Check if unset download locations don't have a repository"""
+
+        self.assertIsNone(get_repository(SpdxNone()))
+        self.assertIsNone(get_repository(SpdxNoAssertion()))
+
+
+class TestRepositoriesReady(unittest.TestCase):
+    @httpretty.activate
+    def test_status_requested(self):
+        """Check if the status of each repository is requested"""
+
+        http_requests = setup_get_repositories_mock_server()
+        client = GrimoireLabClient(GRIMOIRELAB_URL)
+        client.connect()
+        after_date = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(days=7)
+        repositories = ["https://example.com/repo-1", "https://example.com/repo-2", "https://example.com/repo-3"]
+
+        with ThreadPoolExecutor() as executor:
+            ready = repositories_ready(client, repositories, after_date, executor)
+
+        self.assertDictEqual(ready, {repository: "completed" for repository in repositories})
+        requested = [request.querystring["uri"][0] for request in http_requests]
+        self.assertCountEqual(requested, repositories)
+
+
+class TestGenerateMetricsWhenReady(unittest.TestCase):
+    @httpretty.activate
+    @patch("grimoirelab_metrics.cli.get_repository_metrics")
+    def test_slow_scheduling(self, mock_get_repository_metrics):
+        """Check if repositories scheduled one by one are not checked again on each new scheduled one"""
+
+        http_requests = setup_get_never_ending_repositories_mock_server()
+        client = GrimoireLabClient(GRIMOIRELAB_URL)
+        client.connect()
+        repositories = [f"https://example.com/repo-{i}" for i in range(10)]
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            scheduling_tasks = {repository: executor.submit(time.sleep, 0.1) for repository in repositories}
+            metrics = generate_metrics_when_ready(
+                grimoirelab_client=client,
+                repositories=repositories,
+                opensearch_url=OPENSEARCH_URL,
+                opensearch_index=OPENSEARCH_INDEX,
+                timeout=3,
+                scheduling_tasks=scheduling_tasks,
+            )
+
+        self.assertDictEqual(metrics, {"repositories": {}})
+        mock_get_repository_metrics.assert_not_called()
+
+        # Each repository is checked once when it's scheduled, and
+        # then on the polls at 2 seconds and when the timeout expires
+        checks = Counter(request.querystring["uri"][0] for request in http_requests)
+        self.assertListEqual(sorted(checks), repositories)
+        for uri, count in checks.items():
+            self.assertLessEqual(count, 3, uri)
+
+
+class TestNextPollDelay(unittest.TestCase):
+    def test_no_progress(self):
+        """Check if the delay grows up to the limit when no repository is ready"""
+
+        self.assertEqual(_next_poll_delay(2, progress=False, pending=10), 4)
+        self.assertEqual(_next_poll_delay(16, progress=False, pending=10), 25)
+        self.assertEqual(_next_poll_delay(25, progress=False, pending=10), 25)
+
+    def test_progress(self):
+        """Check if the delay decreases down to the limit when some repository is ready"""
+
+        self.assertEqual(_next_poll_delay(16, progress=True, pending=10), 8)
+        self.assertEqual(_next_poll_delay(2, progress=True, pending=10), 2)
+
+    def test_few_pending(self):
+        """Check if the delay is capped when only a few repositories are pending"""
+
+        self.assertEqual(_next_poll_delay(16, progress=False, pending=3), 5)
+        self.assertEqual(_next_poll_delay(2, progress=False, pending=1), 4)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import json
+import threading
+import unittest
+
+import httpretty
+
+from concurrent.futures import ThreadPoolExecutor
+
+from grimoirelab_metrics.grimoirelab_client import GrimoireLabClient
+
+
+GRIMOIRELAB_URL = "http://localhost:8000"
+
+TOKEN_URL = f"{GRIMOIRELAB_URL}/token/"
+REFRESH_TOKEN_URL = f"{GRIMOIRELAB_URL}/token/refresh/"
+REPOSITORIES_URL = f"{GRIMOIRELAB_URL}/datasources/repositories/"
+
+
+class TestGrimoireLabClient(unittest.TestCase):
+    def test_pool_size(self):
+        """Check if the pool keeps alive a connection for each concurrent request"""
+
+        client = GrimoireLabClient(GRIMOIRELAB_URL, max_concurrent=64)
+        client.connect()
+
+        adapter = client.session.get_adapter(GRIMOIRELAB_URL)
+        self.assertEqual(adapter.poolmanager.connection_pool_kw["maxsize"], 64)
+
+    @httpretty.activate
+    def test_concurrent_expired_token(self):
+        """Check if the token is refreshed once when several threads find it expired"""
+
+        refresh_requests = []
+        expired_requests = []
+        all_expired = threading.Barrier(4, timeout=10)
+
+        def token_callback(request, uri, headers):
+            return 200, headers, json.dumps({"access": "old-token", "refresh": "refresh-token"})
+
+        def refresh_callback(request, uri, headers):
+            refresh_requests.append(request)
+            return 200, headers, json.dumps({"access": "new-token"})
+
+        def repositories_callback(request, uri, headers):
+            if request.headers["Authorization"] != "Bearer new-token":
+                expired_requests.append(request)
+                return 401, headers, json.dumps({"detail": "Token is expired"})
+            return 200, headers, json.dumps({"results": []})
+
+        httpretty.register_uri(httpretty.POST, TOKEN_URL, body=token_callback)
+        httpretty.register_uri(httpretty.POST, REFRESH_TOKEN_URL, body=refresh_callback)
+        httpretty.register_uri(httpretty.GET, REPOSITORIES_URL, body=repositories_callback)
+
+        client = GrimoireLabClient(GRIMOIRELAB_URL, "user", "password")
+        client.connect()
+
+        def get_repositories():
+            # Wait until every thread is ready to send its request with the expired token
+            all_expired.wait()
+            return client.get("datasources/repositories/")
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(get_repositories) for _ in range(4)]
+            responses = [future.result() for future in futures]
+
+        self.assertListEqual([response.status_code for response in responses], [200] * 4)
+        self.assertGreaterEqual(len(expired_requests), 1)
+        self.assertEqual(len(refresh_requests), 1)
+        self.assertEqual(client.session.headers["Authorization"], "Bearer new-token")
+
+
+if __name__ == "__main__":
+    unittest.main()
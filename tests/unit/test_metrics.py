@@ -19,19 +19,44 @@ import datetime
 import json
 import unittest
 
-from grimoirelab_metrics.metrics import GitEventsAnalyzer
+from fractions import Fraction
 
+from grimoirelab_metrics.metrics import GIT_EVENT_COMMIT, GitEventsAnalyzer, connect_to_opensearch
 
-def read_file(filename):
+
+def commit_event(author, message="Another commit", commit_date=None):
+    """Return a commit event with the given author, message and date"""
+
+    data = {"Author": author, "message": message}
+    if commit_date:
+        data["CommitDate"] = commit_date.isoformat()
+    return {"type": GIT_EVENT_COMMIT, "data": data}
+
+
+# Reference time for the commits dated relative to now; the
+# tests only check day boundaries, so it can be shared
+NOW = datetime.datetime.now(tz=datetime.timezone.utc)
+
+# Commits added by several tests; the analyzer doesn't modify
+# the events, so they can be shared
+AUTHOR1_EXAMPLE2_COMMIT = commit_event("Author 1 <author1@example2.com>")
+AUTHOR1_EXAMPLE_NEW_COMMIT = commit_event("Author 1 <author1@example_new.com>")
+
+
+def read_json_file(filename):
     with open(filename) as f:
-        return f.read()
+        return json.load(f)
 
 
 class TestGitEventsAnalyzer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The analyzer doesn't modify the events, so tests can share them
+        cls.events = read_json_file("data/events.json")
+        cls.file_events = read_json_file("data/file_events.json")
+
     def setUp(self):
         self.analyzer = GitEventsAnalyzer()
-        self.events = json.loads(read_file("data/events.json"))
-        self.file_events = json.loads(read_file("data/file_events.json"))
 
     def test_commit_count(self):
         """Test that the commit count is calculated correctly"""
@@ -45,13 +70,7 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.analyzer.process_events(self.events)
         self.assertEqual(self.analyzer.get_contributor_count(), 3)
 
-        extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example2.com>", "message": "Another commit"},
-            }
-        ]
-        self.analyzer.process_events(extra_events)
+        self.analyzer.process_events([AUTHOR1_EXAMPLE2_COMMIT])
         self.assertEqual(self.analyzer.get_contributor_count(), 4)
 
     def test_organization_count(self):
@@ -60,12 +79,12 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.analyzer.process_events(self.events)
         self.assertEqual(self.analyzer.get_organization_count(), 2)
 
-        extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example3.com>", "message": "Another commit"},
-            }
-        ]
+        extra_events = [commit_event("Author 1 <author1@example3.com>")]
+        self.analyzer.process_events(extra_events)
+        self.assertEqual(self.analyzer.get_organization_count(), 3)
+
+        # Authors without email don't have organization
+        extra_events = [commit_event("Author 2")]
         self.analyzer.process_events(extra_events)
         self.assertEqual(self.analyzer.get_organization_count(), 3)
 
@@ -78,20 +97,7 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(self.analyzer.get_pony_factor(), 1)
 
         # Include commits from another author to increase the pony factor
-        extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example2.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example2.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example2.com>", "message": "Another commit"},
-            },
-        ]
+        extra_events = (AUTHOR1_EXAMPLE2_COMMIT,) * 3
         self.analyzer.process_events(extra_events)
         self.assertEqual(self.analyzer.get_pony_factor(), 2)
 
@@ -103,6 +109,12 @@ class TestGitEventsAnalyzer(unittest.TestCase):
 
         self.assertEqual(analyzer.get_pony_factor(), 2)
 
+        # Thresholds can also be given when getting the factor
+        expected = {0.8: 2, 0.5: 1, 0.95: 3}
+        for threshold, factor in expected.items():
+            with self.subTest(threshold=threshold):
+                self.assertEqual(analyzer.get_pony_factor(threshold=threshold), factor)
+
     def test_get_elephant_factor(self):
         """Test the computation of the elephant factor is correct"""
 
@@ -112,28 +124,7 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(self.analyzer.get_elephant_factor(), 1)
 
         # Include commits from another company to increase the elephant factor.
-        extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example2.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example2.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example2.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example2.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example2.com>", "message": "Another commit"},
-            },
-        ]
+        extra_events = (AUTHOR1_EXAMPLE2_COMMIT,) * 5
         self.analyzer.process_events(extra_events)
         self.assertEqual(self.analyzer.get_elephant_factor(), 2)
 
@@ -145,6 +136,12 @@ class TestGitEventsAnalyzer(unittest.TestCase):
 
         self.assertEqual(analyzer.get_elephant_factor(), 2)
 
+        # Thresholds can also be given when getting the factor
+        expected = {0.8: 2, 0.5: 1, 0.95: 2}
+        for threshold, factor in expected.items():
+            with self.subTest(threshold=threshold):
+                self.assertEqual(analyzer.get_elephant_factor(threshold=threshold), factor)
+
     def test_file_type_metrics(self):
         """Test that file type metrics are calculated correctly"""
 
@@ -175,6 +172,47 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(file_metrics["binary"], 4)
         self.assertEqual(file_metrics["other"], 22)
 
+    def test_file_type_metrics_overlapping_regex(self):
+        """Test that code patterns take precedence when both patterns match a file"""
+
+        analyzer = GitEventsAnalyzer(code_file_pattern=r"\.c$", binary_file_pattern=r"bin/")
+        event = commit_event("User <user@example.com>")
+        event["data"]["files"] = [{"file": "bin/main.c"}, {"file": "bin/main"}, {"file": "README"}]
+
+        analyzer.process_events([event])
+
+        file_metrics = analyzer.get_file_type_metrics()
+        self.assertEqual(file_metrics, {"code": 1, "binary": 1, "other": 1})
+
+    def test_file_type_metrics_regex_flags(self):
+        """Test that custom patterns can set inline flags"""
+
+        analyzer = GitEventsAnalyzer(code_file_pattern=r"(?i)\.py$", binary_file_pattern=r"(?i)\.zip$")
+        event = commit_event("User <user@example.com>")
+        event["data"]["files"] = [{"file": "main.PY"}, {"file": "dist/app.Zip"}, {"file": "README"}]
+
+        analyzer.process_events([event])
+
+        file_metrics = analyzer.get_file_type_metrics()
+        self.assertEqual(file_metrics, {"code": 1, "binary": 1, "other": 1})
+
+    def test_file_type_metrics_default_extensions(self):
+        """Test that C# and C++ files are classified as code"""
+
+        event = {
+            "type": GIT_EVENT_COMMIT,
+            "data": {
+                "Author": "User <user@example.com>",
+                "CommitDate": "Tue Jan 9 11:15:39 2024 +0100",
+                "files": [{"file": "src/main.cs"}, {"file": "src/main.cxx"}, {"file": "dist/app.zip"}],
+            },
+        }
+
+        self.analyzer.process_events([event])
+
+        file_metrics = self.analyzer.get_file_type_metrics()
+        self.assertEqual(file_metrics, {"code": 2, "binary": 1, "other": 0})
+
     def test_commit_size_metrics(self):
         """Test that commit size metrics are calculated correctly"""
 
@@ -186,6 +224,25 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(commit_size["added_lines"], 5352)
         self.assertEqual(commit_size["removed_lines"], 562)
 
+        # Binary files don't have lines and numbers can be integers
+        extra_events = [
+            {
+                "type": GIT_EVENT_COMMIT,
+                "data": {
+                    "Author": "User <user@example.com>",
+                    "files": [
+                        {"file": "logo.png", "added": "-", "removed": "-"},
+                        {"file": "main.py", "added": 10, "removed": 2},
+                    ],
+                },
+            }
+        ]
+        self.analyzer.process_events(extra_events)
+
+        commit_size = self.analyzer.get_commit_size_metrics()
+        self.assertEqual(commit_size["added_lines"], 5362)
+        self.assertEqual(commit_size["removed_lines"], 564)
+
     def test_message_size_metrics(self):
         """Test that message size metrics are calculated correctly"""
 
@@ -201,8 +258,8 @@ class TestGitEventsAnalyzer(unittest.TestCase):
 
         self.analyzer.process_events(self.events)
         metrics = self.analyzer.get_commit_frequency_metrics(days_interval=30)
-        self.assertAlmostEqual(metrics["week"], 9 / (30 / 7), delta=0.1)
-        self.assertAlmostEqual(metrics["month"], 9, delta=0.1)
+        self.assertAlmostEqual(metrics["week"], Fraction(9 * 7, 30))
+        self.assertEqual(metrics["month"], 9)
         self.assertIsNone(metrics["year"])
 
     def test_get_all_commits_frequency(self):
@@ -210,9 +267,9 @@ class TestGitEventsAnalyzer(unittest.TestCase):
 
         self.analyzer.process_events(self.events)
         metrics = self.analyzer.get_commit_frequency_metrics(days_interval=365)
-        self.assertAlmostEqual(metrics["week"], 9 / (365 / 7), delta=0.1)
-        self.assertAlmostEqual(metrics["month"], 9 / (365 / 30), delta=0.1)
-        self.assertAlmostEqual(metrics["year"], 9, delta=0.1)
+        self.assertAlmostEqual(metrics["week"], Fraction(9 * 7, 365))
+        self.assertAlmostEqual(metrics["month"], Fraction(9 * 30, 365))
+        self.assertEqual(metrics["year"], 9)
 
     def test_get_developer_categories(self):
         """Test if the developer categories are calculated correctly"""
@@ -225,24 +282,7 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertDictEqual(categories, {"core": 1, "regular": 1, "casual": 1})
 
         # Add a core developer to change the categories
-        extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example_new.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example_new.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example_new.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example_new.com>", "message": "Another commit"},
-            },
-        ]
+        extra_events = (AUTHOR1_EXAMPLE_NEW_COMMIT,) * 4
 
         self.analyzer.process_events(extra_events)
         categories = self.analyzer.get_developer_categories()
@@ -255,24 +295,7 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertDictEqual(categories, {"core": 0, "regular": 0, "casual": 0})
 
         # Add a core developer with 100% of the contributions
-        extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example_new.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example_new.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example_new.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example_new.com>", "message": "Another commit"},
-            },
-        ]
+        extra_events = (AUTHOR1_EXAMPLE_NEW_COMMIT,) * 4
 
         self.analyzer.process_events(extra_events)
         categories = self.analyzer.get_developer_categories()
@@ -285,28 +308,7 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertDictEqual(categories, {"core": 0, "regular": 0, "casual": 0})
 
         # Add core developers with the same number of contributions
-        extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 1 <author1@example_new.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 2 <author2@example_new.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 3 <author3@example_new.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 4 <author4@example_new.com>", "message": "Another commit"},
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {"Author": "Author 5 <author5@example_new.com>", "message": "Another commit"},
-            },
-        ]
+        extra_events = [commit_event(f"Author {i} <author{i}@example_new.com>") for i in range(1, 6)]
 
         self.analyzer.process_events(extra_events)
         categories = self.analyzer.get_developer_categories()
@@ -327,6 +329,16 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         categories = analyzer_2.get_developer_categories()
         self.assertDictEqual(categories, {"core": 2, "regular": 0, "casual": 1})
 
+        # Thresholds can also be given when getting the categories
+        expected = {
+            (0.5, 0.9): {"core": 1, "regular": 1, "casual": 1},
+            (0.95, 0.99): {"core": 2, "regular": 0, "casual": 1},
+            (0.8, 0.95): {"core": 1, "regular": 1, "casual": 1},
+        }
+        for thresholds, categories in expected.items():
+            with self.subTest(thresholds=thresholds):
+                self.assertDictEqual(analyzer.get_developer_categories(thresholds), categories)
+
     def test_repository_metadata(self):
         """Test if the repository metadata is calculated correctly"""
 
@@ -347,25 +359,9 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(recent_organizations, 0)
 
         # Add events from a new organization in the last 30 days and 90 days
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
-
         extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 1 <author1@example_new.com>",
-                    "message": "Another commit",
-                    "CommitDate": (now - datetime.timedelta(days=15)).isoformat(),
-                },
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 2 <author2@example_new_2.com>",
-                    "message": "Another commit",
-                    "CommitDate": (now - datetime.timedelta(days=60)).isoformat(),
-                },
-            },
+            commit_event("Author 1 <author1@example_new.com>", commit_date=NOW - datetime.timedelta(days=15)),
+            commit_event("Author 2 <author2@example_new_2.com>", commit_date=NOW - datetime.timedelta(days=60)),
         ]
 
         self.analyzer.process_events(extra_events)
@@ -381,25 +377,9 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(recent_contributors, 0)
 
         # Add events from new contributors in the last days
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
-
         extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 1 <author1@example_new.com>",
-                    "message": "Another commit",
-                    "CommitDate": (now - datetime.timedelta(days=35)).isoformat(),
-                },
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 2 <author2@example_new_2.com>",
-                    "message": "Another commit",
-                    "CommitDate": (now - datetime.timedelta(days=60)).isoformat(),
-                },
-            },
+            commit_event("Author 1 <author1@example_new.com>", commit_date=NOW - datetime.timedelta(days=35)),
+            commit_event("Author 2 <author2@example_new_2.com>", commit_date=NOW - datetime.timedelta(days=60)),
         ]
 
         self.analyzer.process_events(extra_events)
@@ -415,25 +395,9 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(growth, -1.0)
 
         # Add events from new contributors in the last days
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
-
         extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 1 <author1@example_new.com>",
-                    "message": "Another commit",
-                    "CommitDate": (now - datetime.timedelta(days=15)).isoformat(),
-                },
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 2 <author2@example_new_2.com>",
-                    "message": "Another commit",
-                    "CommitDate": (now - datetime.timedelta(days=60)).isoformat(),
-                },
-            },
+            commit_event("Author 1 <author1@example_new.com>", commit_date=NOW - datetime.timedelta(days=15)),
+            commit_event("Author 2 <author2@example_new_2.com>", commit_date=NOW - datetime.timedelta(days=60)),
         ]
 
         self.analyzer.process_events(extra_events)
@@ -449,25 +413,9 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(growth, -3)
 
         # Add events from new contributors in the last days
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
-
         extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 1 <author1@example_new.com>",
-                    "message": "Another commit",
-                    "CommitDate": (now - datetime.timedelta(days=15)).isoformat(),
-                },
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 2 <author2@example_new_2.com>",
-                    "message": "Another commit",
-                    "CommitDate": (now - datetime.timedelta(days=60)).isoformat(),
-                },
-            },
+            commit_event("Author 1 <author1@example_new.com>", commit_date=NOW - datetime.timedelta(days=15)),
+            commit_event("Author 2 <author2@example_new_2.com>", commit_date=NOW - datetime.timedelta(days=60)),
         ]
 
         self.analyzer.process_events(extra_events)
@@ -513,7 +461,6 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         """Test if the days since last commit are calculated correctly"""
 
         # Add an event with a commit from 10 days ago
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
         events = [
             {
                 "type": "org.grimoirelab.events.git.commit",
@@ -521,7 +468,7 @@ class TestGitEventsAnalyzer(unittest.TestCase):
                     "commit": "abcdef1234567890abcdef1234567890abcdef12",
                     "Author": "Author 1 <author1@example_new.com>",
                     "message": "Old commit",
-                    "CommitDate": (now - datetime.timedelta(days=10, hours=1)).isoformat(),
+                    "CommitDate": (NOW - datetime.timedelta(days=10, hours=1)).isoformat(),
                 },
             }
         ]
@@ -538,7 +485,6 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(recent_commits, 0)
 
         # Add an event with a commit from 10 days ago
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
         extra_events = [
             {
                 "type": "org.grimoirelab.events.git.commit",
@@ -546,7 +492,7 @@ class TestGitEventsAnalyzer(unittest.TestCase):
                     "commit": "abcdef1234567890abcdef1234567890abcdef12",
                     "Author": "Author 1 <author1@example_new.com>",
                     "message": "Old commit",
-                    "CommitDate": (now - datetime.timedelta(days=10, hours=1)).isoformat(),
+                    "CommitDate": (NOW - datetime.timedelta(days=10, hours=1)).isoformat(),
                 },
             }
         ]
@@ -620,25 +566,9 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(rate, 0.5)
 
         # Add events from new contributors
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
-
         extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 1 <author1@example_new.com>",
-                    "message": "Another commit",
-                    "CommitDate": now.isoformat(),
-                },
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 1 <author1@example_new_2.com>",
-                    "message": "Another commit 2",
-                    "CommitDate": now.isoformat(),
-                },
-            },
+            commit_event("Author 1 <author1@example_new.com>", commit_date=NOW),
+            commit_event("Author 1 <author1@example_new_2.com>", "Another commit 2", commit_date=NOW),
         ]
 
         # 1 casual contributor and 4 regular contributors
@@ -655,25 +585,9 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(returning_contributors, 0)
 
         # Add events from returning contributors
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
-
         extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "UserTwo <usertwo@example2.com>",
-                    "message": "Another commit",
-                    "CommitDate": (now - datetime.timedelta(days=15)).isoformat(),
-                },
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "User One <userone@example.com>",
-                    "message": "Another commit",
-                    "CommitDate": (now - datetime.timedelta(days=60)).isoformat(),
-                },
-            },
+            commit_event("UserTwo <usertwo@example2.com>", commit_date=NOW - datetime.timedelta(days=15)),
+            commit_event("User One <userone@example.com>", commit_date=NOW - datetime.timedelta(days=60)),
         ]
 
         self.analyzer.process_events(extra_events)
@@ -697,24 +611,11 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(rate, 0)
 
         # Add events from new commits
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
         extra_events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 1 <author1@example_new.com>",
-                    "message": "Another commit",
-                    "CommitDate": (now - datetime.timedelta(days=15)).isoformat(),
-                },
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 2 <author2@example_new_2.com>",
-                    "message": "Another commit 2",
-                    "CommitDate": (now - datetime.timedelta(days=60)).isoformat(),
-                },
-            },
+            commit_event("Author 1 <author1@example_new.com>", commit_date=NOW - datetime.timedelta(days=15)),
+            commit_event(
+                "Author 2 <author2@example_new_2.com>", "Another commit 2", commit_date=NOW - datetime.timedelta(days=60)
+            ),
         ]
         self.analyzer.process_events(extra_events)
 
@@ -725,24 +626,11 @@ class TestGitEventsAnalyzer(unittest.TestCase):
     def test_get_commits_rate_only_last_30_days(self):
         """Test if the commits rate is calculated correctly when there are only commits in the last 30 days"""
 
-        now = datetime.datetime.now(tz=datetime.timezone.utc)
         events = [
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 1 <author1@example_new.com>",
-                    "message": "Another commit",
-                    "CommitDate": (now - datetime.timedelta(days=15)).isoformat(),
-                },
-            },
-            {
-                "type": "org.grimoirelab.events.git.commit",
-                "data": {
-                    "Author": "Author 2 <author2@example_new_2.com>",
-                    "message": "Another commit 2",
-                    "CommitDate": (now - datetime.timedelta(days=20)).isoformat(),
-                },
-            },
+            commit_event("Author 1 <author1@example_new.com>", commit_date=NOW - datetime.timedelta(days=15)),
+            commit_event(
+                "Author 2 <author2@example_new_2.com>", "Another commit 2", commit_date=NOW - datetime.timedelta(days=20)
+            ),
         ]
         self.analyzer.process_events(events)
 
@@ -751,5 +639,27 @@ class TestGitEventsAnalyzer(unittest.TestCase):
         self.assertEqual(rate, 1.0)
 
 
+class TestConnectToOpenSearch(unittest.TestCase):
+    def test_pool_size(self):
+        """Check if connections are only shared when they have the same pool size"""
+
+        conn = connect_to_opensearch("http://localhost:9200", pool_maxsize=8)
+        same_conn = connect_to_opensearch("http://localhost:9200", pool_maxsize=8)
+        other_conn = connect_to_opensearch("http://localhost:9200", pool_maxsize=64)
+
+        self.assertIs(conn, same_conn)
+        self.assertIsNot(conn, other_conn)
+        self.assertEqual(other_conn.transport.pool_maxsize, 64)
+
+    def test_cache_size(self):
+        """Check if only the last connections are kept"""
+
+        connect_to_opensearch.cache_clear()
+        for i in range(10):
+            connect_to_opensearch("http://localhost:9200", username=f"user-{i}", password="password")
+
+        self.assertEqual(connect_to_opensearch.cache_info().currsize, 4)
+
+
 if __name__ == "__main__":
     unittest.main()